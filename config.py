@@ -14,7 +14,8 @@ SECRET_KEY = os.getenv('ALPACA_SECRET_KEY')
 # Trading Configuration
 PAPER_TRADING = True  # Set to False for live trading
 SYMBOLS = ['SPY', 'QQQ']  # Symbols to trade
-CHECK_INTERVAL = 60  # Seconds between strategy checks (5 minutes)
+CHECK_INTERVAL = 60  # Seconds between strategy checks (5 minutes), or account refreshes when streaming
+STREAMING = True  # Trade on live bar updates instead of polling every CHECK_INTERVAL
 
 # Strategy Configuration
 SHORT_WINDOW = 10  # Short moving average period
@@ -0,0 +1,182 @@
+"""
+Indicator kernels used by the trading strategies
+Compiled with numba when it is installed, otherwise they run as plain Python loops.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def compute_indicators(close, volume, short_window, long_window, rsi_window,
+                       fast_span, slow_span, signal_span, volume_window, trend_window):
+    """
+    Moving averages, RSI, MACD, volume ratio and trend strength in a single pass over the bars
+    Every window is kept as a running sum, RSI uses Wilder's smoothing (the first
+    value needs rsi_window price changes); trend strength is the rolling sample std of
+    bar-to-bar returns, updated Welford-style. Values are NaN until their window is full.
+    EMAs use the same bias-adjusted weights as pandas ewm(span=...).mean(), carried as a
+    weighted sum and weight total so each bar is one multiply-add per state.
+    Outputs take the dtype of the inputs; the running state is always float64.
+    """
+    n = close.size
+    ma_short = np.empty(n, close.dtype)
+    ma_long = np.empty(n, close.dtype)
+    rsi = np.empty(n, close.dtype)
+    macd = np.empty(n, close.dtype)
+    macd_signal = np.empty(n, close.dtype)
+    volume_ratio = np.empty(n, volume.dtype)
+    trend_strength = np.empty(n, close.dtype)
+    ma_short[:] = np.nan
+    ma_long[:] = np.nan
+    rsi[:] = np.nan
+    volume_ratio[:] = np.nan
+    trend_strength[:] = np.nan
+    
+    short_sum = 0.0
+    long_sum = 0.0
+    volume_sum = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    ret_mean = 0.0
+    ret_m2 = 0.0
+    fast_decay = 1.0 - 2.0 / (fast_span + 1.0)
+    slow_decay = 1.0 - 2.0 / (slow_span + 1.0)
+    signal_decay = 1.0 - 2.0 / (signal_span + 1.0)
+    fast_num = fast_den = 0.0
+    slow_num = slow_den = 0.0
+    signal_num = signal_den = 0.0
+    for i in range(n):
+        x = float(close[i])  # Read bars as float64 so every running sum stays float64
+        
+        # Moving averages
+        short_sum += x
+        if i >= short_window:
+            short_sum -= float(close[i - short_window])
+        if i >= short_window - 1:
+            ma_short[i] = short_sum / short_window
+        long_sum += x
+        if i >= long_window:
+            long_sum -= float(close[i - long_window])
+        if i >= long_window - 1:
+            ma_long[i] = long_sum / long_window
+        
+        # Wilder's RSI: the first rsi_window changes are averaged, later ones are
+        # smoothed in as avg = (avg * (n - 1) + change) / n
+        # Gains and losses are split with max() instead of a branch per bar
+        if i > 0:
+            delta = x - float(close[i - 1])
+            if i <= rsi_window:
+                avg_gain += max(delta, 0.0) / rsi_window
+                avg_loss += max(-delta, 0.0) / rsi_window
+            else:
+                avg_gain = (avg_gain * (rsi_window - 1) + max(delta, 0.0)) / rsi_window
+                avg_loss = (avg_loss * (rsi_window - 1) + max(-delta, 0.0)) / rsi_window
+            if i >= rsi_window:
+                if avg_loss > 0:
+                    rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+                elif avg_gain > 0:
+                    rsi[i] = 100.0
+        
+        # MACD: fast EMA - slow EMA, and the EMA of that as the signal line
+        fast_num = x + fast_decay * fast_num
+        fast_den = 1.0 + fast_decay * fast_den
+        slow_num = x + slow_decay * slow_num
+        slow_den = 1.0 + slow_decay * slow_den
+        macd_value = fast_num / fast_den - slow_num / slow_den
+        macd[i] = macd_value
+        signal_num = macd_value + signal_decay * signal_num
+        signal_den = 1.0 + signal_decay * signal_den
+        macd_signal[i] = signal_num / signal_den
+        
+        # Volume relative to its moving average
+        v = float(volume[i])
+        volume_sum += v
+        if i >= volume_window:
+            volume_sum -= float(volume[i - volume_window])
+        if i >= volume_window - 1 and volume_sum > 0:
+            volume_ratio[i] = v / (volume_sum / volume_window)
+        
+        # Trend strength over returns 1..i (there is no return for the first bar)
+        if i == 0:
+            continue
+        ret = x / float(close[i - 1]) - 1.0
+        if i <= trend_window:
+            prev_mean = ret_mean
+            ret_mean += (ret - prev_mean) / i
+            ret_m2 += (ret - prev_mean) * (ret - ret_mean)
+        else:
+            j = i - trend_window
+            old = float(close[j]) / float(close[j - 1]) - 1.0
+            prev_mean = ret_mean
+            ret_mean += (ret - old) / trend_window
+            ret_m2 += (ret - old) * (ret - ret_mean + old - prev_mean)
+        if i >= trend_window:
+            trend_strength[i] = np.sqrt(max(ret_m2, 0.0) / (trend_window - 1))
+    
+    return ma_short, ma_long, rsi, macd, macd_signal, volume_ratio, trend_strength
+
+
+@njit(cache=True)
+def run_backtest(close, buy_scores, sell_scores, start_idx, start_cash, position_pct):
+    """
+    Long-only backtest state machine over precomputed signal scores
+    Buys position_pct of cash when flat and the buy score reaches 1, sells everything when
+    holding and the sell score reaches 1. Returns the equity per bar from start_idx and the
+    trade log as parallel arrays (bar index, +1 buy / -1 sell, shares, score) plus its length.
+    """
+    n_steps = close.size - start_idx
+    equity_curve = np.empty(n_steps)
+    trade_idx = np.empty(n_steps, dtype=np.int64)
+    trade_side = np.empty(n_steps, dtype=np.int8)
+    trade_shares = np.empty(n_steps, dtype=np.int64)
+    trade_signals = np.empty(n_steps)
+    trade_count = 0
+    
+    position = 0
+    cash = start_cash
+    for i in range(start_idx, close.size):
+        price = close[i]
+        if buy_scores[i] >= 1 and position == 0:
+            shares = int(cash * position_pct / price)
+            if shares > 0:
+                position = shares
+                cash -= shares * price
+                trade_idx[trade_count] = i
+                trade_side[trade_count] = 1
+                trade_shares[trade_count] = shares
+                trade_signals[trade_count] = buy_scores[i]
+                trade_count += 1
+        elif sell_scores[i] >= 1 and position > 0:
+            cash += position * price
+            trade_idx[trade_count] = i
+            trade_side[trade_count] = -1
+            trade_shares[trade_count] = position
+            trade_signals[trade_count] = sell_scores[i]
+            trade_count += 1
+            position = 0
+        equity_curve[i - start_idx] = cash + position * price
+    
+    return equity_curve, trade_idx, trade_side, trade_shares, trade_signals, trade_count
+
+
+def precompile(dtype=np.float32):
+    """
+    Call every kernel once on dummy bars so numba compiles them up front
+    cache=True keeps the machine code on disk, so after the first run this only loads it.
+    Use the same dtype the bot feeds compute_indicators, or the first real call compiles again.
+    """
+    close = np.linspace(100.0, 110.0, 64).astype(dtype)
+    volume = np.full(64, 1000.0, dtype=dtype)
+    compute_indicators(close, volume, 5, 15, 10, 8, 21, 6, 10, 10)
+    # The backtest always gets float64 closes so cash and sizing stay full precision
+    scores = np.zeros(64)
+    run_backtest(close.astype(np.float64), scores, scores, 20, 10000.0, 0.15)
@@ -5,27 +5,25 @@ This script runs the trading bot with proper configuration and error handling.
 """
 
 import sys
-import os
-from trading_bot import TradingBot
-from config import *
-from dotenv import load_dotenv
-import os
-import alpaca_trade_api as tradeapi
-from alpaca_trade_api.rest import TimeFrame
 
-load_dotenv()
-api = tradeapi.REST(os.getenv('ALPACA_API_KEY'), os.getenv('ALPACA_SECRET_KEY'), 'https://paper-api.alpaca.markets', api_version='v2')
+def _smoke_test(api_key, secret_key):
+    """Print the last few SPY minute bars to check the trading API works"""
+    import alpaca_trade_api as tradeapi
+    from alpaca_trade_api.rest import TimeFrame
 
-try:
-    # Use get_bars for stocks (API v2)
-    bars = api.get_bars('SPY', TimeFrame.Minute, limit=5)
-    for bar in bars:
-        print(bar)
-except Exception as e:
-    print("Error:", e)
+    api = tradeapi.REST(api_key, secret_key, 'https://paper-api.alpaca.markets', api_version='v2')
+
+    try:
+        # Use get_bars for stocks (API v2)
+        bars = api.get_bars('SPY', TimeFrame.Minute, limit=5)
+        for bar in bars:
+            print(bar)
+    except Exception as e:
+        print("Error:", e)
 
 def main():
     """Main function to run the trading bot"""
+    from config import API_KEY, SECRET_KEY, PAPER_TRADING, SYMBOLS, CHECK_INTERVAL, STREAMING
     
     # Check if API keys are available
     if not API_KEY or not SECRET_KEY:
@@ -35,10 +33,14 @@ def main():
         print("ALPACA_SECRET_KEY=your_secret_key_here")
         sys.exit(1)
     
+    # Deferred so the key check above doesn't pay for pandas and the Alpaca SDKs
+    from trading_bot import TradingBot
+    _smoke_test(API_KEY, SECRET_KEY)
+    
     try:
         # Initialize the trading bot
         print("🚀 Initializing Trading Bot...")
-        bot = TradingBot(API_KEY, SECRET_KEY, paper=PAPER_TRADING)
+        bot = TradingBot(API_KEY, SECRET_KEY, paper=PAPER_TRADING, precompile=True)
         
         # Test market data connection
         print("\n📊 Testing market data connection...")
@@ -53,9 +55,14 @@ def main():
         print(f"\n🤖 Starting trading bot...")
         print(f"Mode: {'Paper Trading' if PAPER_TRADING else 'Live Trading'}")
         print(f"Symbols: {SYMBOLS}")
-        print(f"Check interval: {CHECK_INTERVAL} seconds")
         
-        bot.run_strategy(SYMBOLS, CHECK_INTERVAL)
+        if STREAMING:
+            print("Data: live bar stream")
+            print(f"Account refresh interval: {CHECK_INTERVAL} seconds")
+            bot.run_stream(SYMBOLS, CHECK_INTERVAL)
+        else:
+            print(f"Check interval: {CHECK_INTERVAL} seconds")
+            bot.run_strategy(SYMBOLS, CHECK_INTERVAL)
         
     except KeyboardInterrupt:
         print("\n🛑 Bot stopped by user")
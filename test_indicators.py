@@ -0,0 +1,70 @@
+"""
+Checks compute_indicators against pandas / a plain Wilder RSI
+Run with: python -m pytest test_indicators.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import compute_indicators
+
+# Same parameters enhanced_strategy and backtest_strategy use
+SHORT, LONG, RSI_N, FAST, SLOW, SIGNAL, VOLUME_N, TREND_N = 5, 15, 10, 8, 21, 6, 10, 10
+
+
+def make_bars(dtype, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 400 + rng.normal(0, 4, n).cumsum()
+    close[rng.random(n) < 0.1] = close[0]  # Some unchanged bars
+    volume = rng.integers(1000, 5000, n).astype(float)
+    return close.astype(dtype), volume.astype(dtype)
+
+
+def wilder_rsi(close, n):
+    delta = np.diff(close.astype(np.float64))
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    rsi = np.full(close.size, np.nan)
+    avg_gain, avg_loss = gain[:n].mean(), loss[:n].mean()
+    rsi[n] = 100 - 100 / (1 + avg_gain / avg_loss)
+    for i in range(n, delta.size):
+        avg_gain = (avg_gain * (n - 1) + gain[i]) / n
+        avg_loss = (avg_loss * (n - 1) + loss[i]) / n
+        rsi[i + 1] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi
+
+
+def reference(close, volume):
+    close_s = pd.Series(close.astype(np.float64))
+    volume_s = pd.Series(volume.astype(np.float64))
+    macd = close_s.ewm(span=FAST).mean() - close_s.ewm(span=SLOW).mean()
+    return {
+        'ma_short': close_s.rolling(SHORT).mean().to_numpy(),
+        'ma_long': close_s.rolling(LONG).mean().to_numpy(),
+        'rsi': wilder_rsi(close, RSI_N),
+        'macd': macd.to_numpy(),
+        'macd_signal': macd.ewm(span=SIGNAL).mean().to_numpy(),
+        'volume_ratio': (volume_s / volume_s.rolling(VOLUME_N).mean()).to_numpy(),
+        'trend_strength': close_s.pct_change().rolling(TREND_N).std().to_numpy(),
+    }
+
+
+@pytest.mark.parametrize('dtype, rtol', [(np.float64, 1e-9), (np.float32, 1e-4)])
+def test_matches_reference(dtype, rtol):
+    close, volume = make_bars(dtype)
+    outputs = compute_indicators(close, volume, SHORT, LONG, RSI_N, FAST, SLOW, SIGNAL, VOLUME_N, TREND_N)
+    expected = reference(close, volume)
+
+    for name, result in zip(expected, outputs):
+        assert result.dtype == dtype, name
+        # Same NaN warm-up as the reference, then the same values
+        np.testing.assert_array_equal(np.isnan(result), np.isnan(expected[name]), err_msg=name)
+        np.testing.assert_allclose(result, expected[name], rtol=rtol, atol=rtol * 1e-2, err_msg=name)
+
+
+def test_rsi_without_losses_is_100():
+    close = np.arange(100.0, 140.0)
+    volume = np.full(close.size, 1000.0)
+    rsi = compute_indicators(close, volume, SHORT, LONG, RSI_N, FAST, SLOW, SIGNAL, VOLUME_N, TREND_N)[2]
+    assert np.isnan(rsi[:RSI_N]).all()
+    assert (rsi[RSI_N:] == 100.0).all()
@@ -5,34 +5,33 @@ This script runs the trading bot with proper configuration and error handling.
 """
 
 import sys
-import os
-from trading_bot import TradingBot
-from config import *
-from dotenv import load_dotenv
-import os
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from datetime import datetime, timedelta
+from datetime import datetime
 
-load_dotenv()
-client = StockHistoricalDataClient(
-    api_key=os.getenv('ALPACA_API_KEY'),
-    secret_key=os.getenv('ALPACA_SECRET_KEY')
-)
+def _smoke_test():
+    """Fetch a day of SPY minute bars to check the data API works"""
+    from alpaca.data.historical import StockHistoricalDataClient
+    from alpaca.data.requests import StockBarsRequest
+    from alpaca.data.timeframe import TimeFrame
+    from config import API_KEY, SECRET_KEY
 
-request_params = StockBarsRequest(
-    symbol_or_symbols=["SPY"],
-    timeframe=TimeFrame.Minute,
-    start=datetime(2023, 7, 1),
-    end=datetime(2023, 7, 2)
-)
+    client = StockHistoricalDataClient(
+        api_key=API_KEY,
+        secret_key=SECRET_KEY
+    )
 
-bars = client.get_stock_bars(request_params)
-print(bars.df)
+    request_params = StockBarsRequest(
+        symbol_or_symbols=["SPY"],
+        timeframe=TimeFrame.Minute,
+        start=datetime(2023, 7, 1),
+        end=datetime(2023, 7, 2)
+    )
+
+    bars = client.get_stock_bars(request_params)
+    print(bars.df)
 
 def main():
     """Main function to run the trading bot"""
+    from config import API_KEY, SECRET_KEY, PAPER_TRADING, SYMBOLS, CHECK_INTERVAL
     
     # Check if API keys are available
     if not API_KEY or not SECRET_KEY:
@@ -42,6 +41,9 @@ def main():
         print("ALPACA_SECRET_KEY=your_secret_key_here")
         sys.exit(1)
     
+    # Deferred so the key check above doesn't pay for pandas and the Alpaca SDKs
+    from trading_bot import TradingBot
+    
     try:
         # Initialize the trading bot
         print("🚀 Initializing Trading Bot...")
@@ -71,4 +73,5 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    _smoke_test()
     main() 
\ No newline at end of file
@@ -1,25 +1,78 @@
 import alpaca_trade_api as tradeapi
+from alpaca_trade_api.rest import APIError
 import pandas as pd
 import numpy as np
-import time
+import io
+import os
+import sys
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from alpaca.data.historical import StockHistoricalDataClient
+from alpaca.data.live import StockDataStream
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-import os
-from dotenv import load_dotenv
 import sqlite3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from indicators import compute_indicators, run_backtest, precompile as precompile_kernels
+
+ENHANCED_LONG_WINDOW = 15  # enhanced_strategy's default long MA period
+LIVE_BARS_LIMIT = ENHANCED_LONG_WINDOW + 50  # Same window enhanced_strategy fetches for itself
+INDICATOR_CACHE_SIZE = 512  # Indicator results kept by _indicators()
+PRICE_DTYPE = np.float32  # Indicator inputs/outputs; kernels still accumulate in float64
+BARS_CACHE_DIR = os.path.expanduser('~/.tradingbot_cache')
+BARS_CACHE_SIZE = 256  # Backtest bar frames kept in memory by _get_backtest_bars()
+
+class _ThreadOutput:
+    """
+    sys.stdout stand-in that keeps what a thread prints inside capture() to itself,
+    so concurrent symbol passes don't interleave their reports
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+    
+    @contextmanager
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
 
 class TradingBot:
-    def __init__(self, api_key, secret_key, paper=True):
-        """Initialize the trading bot with Alpaca API"""
-        load_dotenv()
+    def __init__(self, api_key, secret_key, paper=True, precompile=False):
+        """
+        Initialize the trading bot with Alpaca API
+        precompile: compile the indicator kernels now instead of on the first analysis
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
         self.data_client = StockHistoricalDataClient(
-            api_key=os.getenv('ALPACA_API_KEY'),
-            secret_key=os.getenv('ALPACA_SECRET_KEY')
+            api_key=api_key,
+            secret_key=secret_key
         )
         base_url = 'https://paper-api.alpaca.markets' if paper else 'https://api.alpaca.markets'
         self.api = tradeapi.REST(api_key, secret_key, base_url, api_version='v2')
+        self._configure_session(self.api._session)
+        self._configure_session(self.data_client._session)
+        self._indicator_cache = OrderedDict()
+        self._indicator_lock = threading.Lock()
+        self._bars_cache = OrderedDict()  # (symbol, start_date, end_date) -> closed-range backtest bars
+        self._live_bars = {}  # run_strategy's / run_stream's rolling daily bars per symbol
+        self._positions = None  # symbol -> qty for the current run_strategy cycle / run_stream session
+        self._buying_power = None  # Account buying power for the same span, until an order
+        self._order_lock = threading.Lock()  # Buy sizing and submission, one symbol at a time
         
         # Verify connection
         try:
@@ -29,25 +82,46 @@ class TradingBot:
         except Exception as e:
             print(f"Connection failed: {e}")
         
-        self.conn = sqlite3.connect('trades.db')
+        # Bar handlers in run_stream log trades from worker threads
+        self.conn = sqlite3.connect('trades.db', isolation_level=None, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._configure_connection()
         self._create_trades_table()
+        
+        if precompile:
+            precompile_kernels(PRICE_DTYPE)
     
     def get_market_data(self, symbol, timeframe='1Day', limit=100):
         """Get historical market data for a symbol using the new Alpaca Data SDK"""
+        return self._fetch_market_data([symbol], timeframe, limit)
+    
+    def get_market_data_batch(self, symbols, timeframe='1Day', limit=100):
+        """Get historical market data for several symbols with a single request"""
+        data = self._fetch_market_data(symbols, timeframe, limit)
+        if data is None:
+            return {}
+        fetched = set(data.index.get_level_values('symbol'))
+        return {symbol: data.xs(symbol, level='symbol', drop_level=False)
+                for symbol in symbols if symbol in fetched}
+    
+    def _fetch_market_data(self, symbols, timeframe, limit, start=None):
+        # start: fetch from this bar on instead of the full limit window
         try:
             end = datetime.now()
             if timeframe.lower() == '1day':
                 tf = TimeFrame.Day
-                start = end - timedelta(days=limit + 5)
+                window_start = end - timedelta(days=limit + 5)
             elif timeframe.lower() == '1min':
                 tf = TimeFrame.Minute
-                start = end - timedelta(minutes=limit + 5)
+                window_start = end - timedelta(minutes=limit + 5)
             else:
                 tf = TimeFrame.Day
-                start = end - timedelta(days=limit + 5)
+                window_start = end - timedelta(days=limit + 5)
+            if start is None:
+                start = window_start
 
             request_params = StockBarsRequest(
-                symbol_or_symbols=[symbol],
+                symbol_or_symbols=symbols,
                 timeframe=tf,
                 start=start,
                 end=end
@@ -55,7 +129,7 @@ class TradingBot:
             bars = self.data_client.get_stock_bars(request_params)
             return bars.df
         except Exception as e:
-            print(f"Error getting data for {symbol}: {e}")
+            print(f"Error getting data for {', '.join(symbols)}: {e}")
             return None
     
     def is_market_open(self):
@@ -65,11 +139,19 @@ class TradingBot:
     
     def get_position(self, symbol):
         """Get current position for a symbol"""
+        # Within a run_strategy cycle, use the positions listed at its start
+        positions = self._positions
+        if positions is not None:
+            qty = positions.get(symbol, 0)
+            if qty is not None:
+                return qty
         try:
             position = self.api.get_position(symbol)
             return float(position.qty)
-        except:
-            return 0  # No position
+        except APIError as e:
+            if e.status_code == 404:
+                return 0  # No position
+            raise
     
     def place_order(self, symbol, qty, side, order_type='market'):
         """Place an order"""
@@ -81,6 +163,9 @@ class TradingBot:
                 type=order_type,
                 time_in_force='day'
             )
+            if self._positions is not None:
+                self._positions[symbol] = None  # Changed, ask Alpaca again
+            self._buying_power = None  # Ditto for buying power
             print(f"Order placed: {side} {qty} shares of {symbol}")
             if order is not None:
                 self._log_trade(symbol, side, qty, order)
@@ -89,6 +174,38 @@ class TradingBot:
             print(f"Order failed: {e}")
             return None
     
+    def _get_buying_power(self):
+        """Account buying power, from the current cycle's snapshot while no order has changed it"""
+        buying_power = self._buying_power
+        if buying_power is not None:
+            return buying_power
+        return float(self.api.get_account().buying_power)
+    
+    def _to_arrays(self, bars):
+        """Pull the indicator kernel inputs out of a bars frame once, as contiguous PRICE_DTYPE arrays"""
+        return {column: np.ascontiguousarray(bars[column].to_numpy(dtype=PRICE_DTYPE))
+                for column in ('close', 'volume')}
+    
+    def _indicators(self, symbol, data, arrays, *params):
+        """
+        compute_indicators for these bars, reusing the result of an identical earlier call
+        The key covers the bar range and the latest close/volume, so a new or updated bar
+        is recomputed. Returned arrays are shared and must not be modified.
+        """
+        key = (symbol, data.index[0], data.index[-1], len(data),
+               float(arrays['close'][-1]), float(arrays['volume'][-1])) + params
+        with self._indicator_lock:
+            if key in self._indicator_cache:
+                self._indicator_cache.move_to_end(key)
+                return self._indicator_cache[key]
+        
+        result = compute_indicators(arrays['close'], arrays['volume'], *params)
+        with self._indicator_lock:
+            self._indicator_cache[key] = result
+            if len(self._indicator_cache) > INDICATOR_CACHE_SIZE:
+                self._indicator_cache.popitem(last=False)
+        return result
+    
     def simple_momentum_strategy(self, symbol, short_window=10, long_window=30):
         """
         Simple momentum strategy using moving averages
@@ -97,21 +214,19 @@ class TradingBot:
         """
         # Get historical data
         data = self.get_market_data(symbol, limit=long_window + 10)
-        if data is None or len(data) < long_window:
+        if data is None or len(data) < long_window + 1:
             print(f"Not enough data for {symbol}")
             return
         
-        # Calculate moving averages
-        data[f'MA_{short_window}'] = data['close'].rolling(window=short_window).mean()
-        data[f'MA_{long_window}'] = data['close'].rolling(window=long_window).mean()
+        # Only the current and previous moving averages are needed, so take
+        # them from the tail of the closes instead of rolling the whole series
+        closes = data['close'].to_numpy(dtype=np.float64)
+        current_short_ma = closes[-short_window:].mean()
+        current_long_ma = closes[-long_window:].mean()
+        prev_short_ma = closes[-short_window - 1:-1].mean()
+        prev_long_ma = closes[-long_window - 1:-1].mean()
         
-        # Get current and previous values
-        current_short_ma = data[f'MA_{short_window}'].iloc[-1]
-        current_long_ma = data[f'MA_{long_window}'].iloc[-1]
-        prev_short_ma = data[f'MA_{short_window}'].iloc[-2]
-        prev_long_ma = data[f'MA_{long_window}'].iloc[-2]
-        
-        current_price = data['close'].iloc[-1]
+        current_price = float(closes[-1])
         current_position = self.get_position(symbol)
         
         print(f"\n{symbol} Analysis:")
@@ -139,7 +254,7 @@ class TradingBot:
         else:
             print("No trading signal")
     
-    def enhanced_strategy(self, symbol, short_window=5, long_window=15):
+    def enhanced_strategy(self, symbol, short_window=5, long_window=ENHANCED_LONG_WINDOW, data=None):
         """
         Enhanced strategy with MORE LENIENT conditions for more frequent trading
         - Shorter Moving Averages (5/15 instead of 10/30)
@@ -147,54 +262,39 @@ class TradingBot:
         - Only need 1 signal instead of 2 to trigger trades
         - Higher position size (15% instead of 10%)
         - Relaxed trend strength filter
+        Returns the latest close so callers can reuse it without refetching
+        data: bars the caller already fetched
         """
         # Get historical data
-        data = self.get_market_data(symbol, limit=long_window + 50)
+        if data is None:
+            data = self.get_market_data(symbol, limit=long_window + 50)
         if data is None or len(data) < long_window:
             print(f"Not enough data for {symbol}")
             return
         
-        # Calculate moving averages (SHORTER PERIODS)
-        data[f'MA_{short_window}'] = data['close'].rolling(window=short_window).mean()
-        data[f'MA_{long_window}'] = data['close'].rolling(window=long_window).mean()
-        
-        # Calculate RSI (shorter 10-period instead of 14)
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=10).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=10).mean()
-        rs = gain / loss
-        data['RSI'] = 100 - (100 / (1 + rs))
-        
-        # Calculate MACD (shorter periods)
-        data['EMA_8'] = data['close'].ewm(span=8).mean()
-        data['EMA_21'] = data['close'].ewm(span=21).mean()
-        data['MACD'] = data['EMA_8'] - data['EMA_21']
-        data['MACD_Signal'] = data['MACD'].ewm(span=6).mean()
-        data['MACD_Histogram'] = data['MACD'] - data['MACD_Signal']
-        
-        # Calculate volume moving average (shorter period)
-        data['Volume_MA'] = data['volume'].rolling(window=10).mean()
-        data['Volume_Ratio'] = data['volume'] / data['Volume_MA']
-        
-        # Calculate trend strength (more lenient)
-        data['Price_Change'] = data['close'].pct_change()
-        data['Trend_Strength'] = data['Price_Change'].rolling(window=10).std()
-        
-        # Get current values
-        current_price = data['close'].iloc[-1]
+        bars = self._to_arrays(data)
+        
+        # Calculate moving averages (SHORTER PERIODS), RSI (10-period instead of 14),
+        # MACD (shorter 8/21/6 periods), volume ratio (10-period) and trend
+        # strength (more lenient) in one pass
+        ma_short, ma_long, rsi, macd, macd_signal, volume_ratio, trend_strength = self._indicators(
+            symbol, data, bars, short_window, long_window, 10, 8, 21, 6, 10, 10)
+        
+        # Get current values (prices stay full precision for order sizing)
+        current_price = float(data['close'].iloc[-1])
         current_position = self.get_position(symbol)
         
         # Current indicator values
-        current_short_ma = data[f'MA_{short_window}'].iloc[-1]
-        current_long_ma = data[f'MA_{long_window}'].iloc[-1]
-        prev_short_ma = data[f'MA_{short_window}'].iloc[-2]
-        prev_long_ma = data[f'MA_{long_window}'].iloc[-2]
+        current_short_ma = ma_short[-1]
+        current_long_ma = ma_long[-1]
+        prev_short_ma = ma_short[-2]
+        prev_long_ma = ma_long[-2]
         
-        current_rsi = data['RSI'].iloc[-1]
-        current_macd = data['MACD'].iloc[-1]
-        current_macd_signal = data['MACD_Signal'].iloc[-1]
-        current_volume_ratio = data['Volume_Ratio'].iloc[-1]
-        current_trend_strength = data['Trend_Strength'].iloc[-1]
+        current_rsi = rsi[-1]
+        current_macd = macd[-1]
+        current_macd_signal = macd_signal[-1]
+        current_volume_ratio = volume_ratio[-1]
+        current_trend_strength = trend_strength[-1]
         
         print(f"\n{symbol} LENIENT Enhanced Analysis:")
         print(f"Price: ${current_price:.2f}")
@@ -227,10 +327,10 @@ class TradingBot:
             print("   ✓ RSI overbought SELL signal")
         
         # 3. MACD conditions (same logic, but faster due to shorter periods)
-        if current_macd > current_macd_signal and data['MACD'].iloc[-2] <= data['MACD_Signal'].iloc[-2]:
+        if current_macd > current_macd_signal and macd[-2] <= macd_signal[-2]:
             buy_signals += 1
             print("   ✓ MACD bullish BUY signal")
-        elif current_macd < current_macd_signal and data['MACD'].iloc[-2] >= data['MACD_Signal'].iloc[-2]:
+        elif current_macd < current_macd_signal and macd[-2] >= macd_signal[-2]:
             sell_signals += 1
             print("   ✓ MACD bearish SELL signal")
         
@@ -259,14 +359,15 @@ class TradingBot:
         
         # MORE AGGRESSIVE Decision making (only need 1 signal instead of 2)
         if buy_signals >= 1 and current_position == 0:
-            # Buy signal with lower threshold
-            account = self.api.get_account()
-            buying_power = float(account.buying_power)
-            shares_to_buy = int(buying_power * 0.15 / current_price)  # Use 15% instead of 10%
-            
-            if shares_to_buy > 0:
-                print(f"📈 LENIENT BUY SIGNAL ({buy_signals:.1f} score)!")
-                self.place_order(symbol, shares_to_buy, 'buy')
+            # Buy signal with lower threshold. Sized and submitted under the order lock,
+            # so symbols running concurrently never size against the same buying power
+            with self._order_lock:
+                buying_power = self._get_buying_power()
+                shares_to_buy = int(buying_power * 0.15 / current_price)  # Use 15% instead of 10%
+                
+                if shares_to_buy > 0:
+                    print(f"📈 LENIENT BUY SIGNAL ({buy_signals:.1f} score)!")
+                    self.place_order(symbol, shares_to_buy, 'buy')
         
         elif sell_signals >= 1 and current_position > 0:
             # Sell signal with lower threshold
@@ -275,6 +376,8 @@ class TradingBot:
         
         else:
             print(f"Waiting for signal (Buy: {buy_signals:.1f}, Sell: {sell_signals:.1f})")
+        
+        return current_price
     
     def backtest_strategy(self, symbol, start_date=None, end_date=None):
         """
@@ -289,131 +392,86 @@ class TradingBot:
         
         try:
             # Get historical data
-            bars = self.api.get_bars(symbol, '1Day', start=start_date, end=end_date).df
+            bars = self._get_backtest_bars(symbol, start_date, end_date)
             if len(bars) < 50:
                 print("Not enough data for backtesting")
                 return
             
-            # Initialize backtest variables
-            position = 0
-            cash = 10000  # Starting cash
-            trades = []
-            equity_curve = []
+            # Narrow inputs for the indicator kernel, full-precision closes for the money math
+            arrays = self._to_arrays(bars)
+            close = bars['close'].to_numpy(dtype=np.float64, copy=True)
             
-            # Calculate indicators with NEW LENIENT PARAMETERS
-            bars['MA_5'] = bars['close'].rolling(window=5).mean()
-            bars['MA_15'] = bars['close'].rolling(window=15).mean()
+            # Calculate indicators with NEW LENIENT PARAMETERS: MA 5/15,
+            # RSI (10-period instead of 14), MACD (shorter periods) and
+            # volume ratio (shorter period)
+            ma_short, ma_long, rsi, macd, macd_signal, volume_ratio, _ = self._indicators(
+                symbol, bars, arrays, 5, 15, 10, 8, 21, 6, 10, 10)
             
-            # RSI (10-period instead of 14)
-            delta = bars['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=10).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=10).mean()
-            rs = gain / loss
-            bars['RSI'] = 100 - (100 / (1 + rs))
+            # Score every bar at once with LENIENT thresholds. Values of the
+            # previous bar are the shifted arrays (index 0 wraps around, but
+            # the simulation only starts at bar 20)
+            prev_short, prev_long = np.roll(ma_short, 1), np.roll(ma_long, 1)
+            prev_macd, prev_macd_signal = np.roll(macd, 1), np.roll(macd_signal, 1)
             
-            # MACD (shorter periods)
-            bars['EMA_8'] = bars['close'].ewm(span=8).mean()
-            bars['EMA_21'] = bars['close'].ewm(span=21).mean()
-            bars['MACD'] = bars['EMA_8'] - bars['EMA_21']
-            bars['MACD_Signal'] = bars['MACD'].ewm(span=6).mean()
+            # MA Crossover (5/15 instead of 10/30)
+            buy_scores = ((prev_short <= prev_long) & (ma_short > ma_long)).astype(np.float64)
+            sell_scores = ((prev_short >= prev_long) & (ma_short < ma_long)).astype(np.float64)
             
-            # Volume (shorter period)
-            bars['Volume_MA'] = bars['volume'].rolling(window=10).mean()
-            bars['Volume_Ratio'] = bars['volume'] / bars['Volume_MA']
+            # LENIENT RSI (40/60 instead of 30/70)
+            buy_scores += rsi < 40
+            sell_scores += rsi > 60
             
-            # Simulate trading
-            for i in range(20, len(bars)):
-                current_price = bars['close'].iloc[i]
-                current_date = bars.index[i]
-                
-                # Calculate signals with LENIENT thresholds
-                buy_signals = 0
-                sell_signals = 0
-                
-                # MA Crossover (5/15 instead of 10/30)
-                if (bars['MA_5'].iloc[i-1] <= bars['MA_15'].iloc[i-1] and 
-                    bars['MA_5'].iloc[i] > bars['MA_15'].iloc[i]):
-                    buy_signals += 1
-                elif (bars['MA_5'].iloc[i-1] >= bars['MA_15'].iloc[i-1] and 
-                      bars['MA_5'].iloc[i] < bars['MA_15'].iloc[i]):
-                    sell_signals += 1
-                
-                # LENIENT RSI (40/60 instead of 30/70)
-                if bars['RSI'].iloc[i] < 40:
-                    buy_signals += 1
-                elif bars['RSI'].iloc[i] > 60:
-                    sell_signals += 1
-                
-                # MACD
-                if (bars['MACD'].iloc[i] > bars['MACD_Signal'].iloc[i] and 
-                    bars['MACD'].iloc[i-1] <= bars['MACD_Signal'].iloc[i-1]):
-                    buy_signals += 1
-                elif (bars['MACD'].iloc[i] < bars['MACD_Signal'].iloc[i] and 
-                      bars['MACD'].iloc[i-1] >= bars['MACD_Signal'].iloc[i-1]):
-                    sell_signals += 1
-                
-                # LENIENT Volume confirmation (1.2 instead of 1.5)
-                if bars['Volume_Ratio'].iloc[i] > 1.2:
-                    if buy_signals > sell_signals:
-                        buy_signals += 0.5
-                    elif sell_signals > buy_signals:
-                        sell_signals += 0.5
-                
-                # Price momentum
-                if current_price > bars['MA_5'].iloc[i-1] * 1.005:
-                    buy_signals += 0.5
-                elif current_price < bars['MA_5'].iloc[i-1] * 0.995:
-                    sell_signals += 0.5
-                
-                # Execute trades (ONLY NEED 1 SIGNAL instead of 2)
-                if buy_signals >= 1 and position == 0:
-                    shares = int(cash * 0.15 / current_price)  # Use 15% instead of 10%
-                    if shares > 0:
-                        position = shares
-                        cash -= shares * current_price
-                        trades.append({
-                            'date': current_date,
-                            'action': 'BUY',
-                            'price': current_price,
-                            'shares': shares,
-                            'signals': buy_signals
-                        })
-                
-                elif sell_signals >= 1 and position > 0:
-                    cash += position * current_price
-                    trades.append({
-                        'date': current_date,
-                        'action': 'SELL',
-                        'price': current_price,
-                        'shares': position,
-                        'signals': sell_signals
-                    })
-                    position = 0
-                
-                # Track equity
-                current_equity = cash + (position * current_price)
-                equity_curve.append(current_equity)
+            # MACD
+            buy_scores += (macd > macd_signal) & (prev_macd <= prev_macd_signal)
+            sell_scores += (macd < macd_signal) & (prev_macd >= prev_macd_signal)
+            
+            # LENIENT Volume confirmation (1.2 instead of 1.5)
+            high_volume = volume_ratio > 1.2
+            buy_confirmed = high_volume & (buy_scores > sell_scores)
+            sell_confirmed = high_volume & (sell_scores > buy_scores)
+            buy_scores += 0.5 * buy_confirmed
+            sell_scores += 0.5 * sell_confirmed
+            
+            # Price momentum
+            buy_scores += 0.5 * (close > prev_short * 1.005)
+            sell_scores += 0.5 * (close < prev_short * 0.995)
+            
+            # Simulate trading: 10,000 starting cash, 15% of cash per buy
+            # instead of 10%, ONLY NEED 1 SIGNAL instead of 2
+            (equity_curve, trade_idx, trade_side, trade_shares, trade_signals,
+             trade_count) = run_backtest(close, buy_scores, sell_scores, 20, 10000.0, 0.15)
             
             # Calculate final position value
-            final_price = bars['close'].iloc[-1]
-            final_equity = cash + (position * final_price)
+            final_price = float(close[-1])
+            final_equity = equity_curve[-1]
             
             # Results
             total_return = ((final_equity - 10000) / 10000) * 100
-            buy_hold_return = ((final_price - bars['close'].iloc[20]) / bars['close'].iloc[20]) * 100
+            start_price = float(close[20])
+            buy_hold_return = ((final_price - start_price) / start_price) * 100
             
             print(f"\n📊 LENIENT Backtest Results:")
             print(f"Starting Capital: $10,000")
             print(f"Final Equity: ${final_equity:,.2f}")
             print(f"Total Return: {total_return:.2f}%")
             print(f"Buy & Hold Return: {buy_hold_return:.2f}%")
-            print(f"Number of Trades: {len(trades)}")
+            print(f"Number of Trades: {trade_count}")
+            
+            trade_idx = trade_idx[:trade_count]
+            trade_side = trade_side[:trade_count]
+            buy_count = np.count_nonzero(trade_side > 0)
+            if buy_count > 0:
+                win_rate = np.count_nonzero(trade_side < 0) / buy_count * 100
+                print(f"Win Rate: {win_rate:.1f}%")
             
-            if len(trades) > 0:
-                winning_trades = [t for t in trades if t['action'] == 'SELL']
-                if len([t for t in trades if t['action'] == 'BUY']) > 0:
-                    win_rate = len(winning_trades) / len([t for t in trades if t['action'] == 'BUY']) * 100
-                    print(f"Win Rate: {win_rate:.1f}%")
+            # Build the trade log once, from the filled slots
+            trades = pd.DataFrame({
+                'date': bars.index[trade_idx],
+                'action': np.where(trade_side > 0, 'BUY', 'SELL'),
+                'price': close[trade_idx],
+                'shares': trade_shares[:trade_count],
+                'signals': trade_signals[:trade_count]
+            })
             
             return {
                 'total_return': total_return,
@@ -425,25 +483,59 @@ class TradingBot:
             print(f"Backtest error: {e}")
             return None
 
-    def risk_management(self, symbol, position_size_pct=0.1, stop_loss_pct=0.05, take_profit_pct=0.15):
+    def _get_backtest_bars(self, symbol, start_date, end_date):
+        """
+        Daily bars for backtest_strategy. A range that ended before today can't change
+        anymore, so it is kept in memory and in BARS_CACHE_DIR (when a parquet engine
+        is installed) and reused by later backtests. Cached frames are shared and must
+        not be modified.
+        """
+        if end_date >= datetime.now().strftime('%Y-%m-%d'):
+            return self.api.get_bars(symbol, '1Day', start=start_date, end=end_date).df
+        
+        key = (symbol, start_date, end_date)
+        if key in self._bars_cache:
+            self._bars_cache.move_to_end(key)
+            return self._bars_cache[key]
+        
+        path = os.path.join(BARS_CACHE_DIR, f"{symbol}_{start_date}_{end_date}.parquet")
+        try:
+            bars = pd.read_parquet(path)
+        except Exception:
+            # Missing file, or no parquet engine installed
+            bars = self.api.get_bars(symbol, '1Day', start=start_date, end=end_date).df
+            try:
+                os.makedirs(BARS_CACHE_DIR, exist_ok=True)
+                bars.to_parquet(path)
+            except ImportError:
+                pass  # Keep the in-memory cache only
+            except Exception as e:
+                print(f"Could not write bar cache for {symbol}: {e}")
+        
+        self._bars_cache[key] = bars
+        if len(self._bars_cache) > BARS_CACHE_SIZE:
+            self._bars_cache.popitem(last=False)
+        return bars
+
+    def risk_management(self, symbol, position_size_pct=0.1, stop_loss_pct=0.05, take_profit_pct=0.15,
+                        current_price=None):
         """
         Enhanced risk management with stop-loss and take-profit
+        current_price: latest price if the caller already has it (skips a data fetch)
         """
         current_position = self.get_position(symbol)
         if current_position == 0:
             return
         
         # Get current price
-        data = self.get_market_data(symbol, limit=1)
-        if data is None:
-            return
-        
-        current_price = data['close'].iloc[-1]
+        if current_price is None:
+            data = self.get_market_data(symbol, limit=1)
+            if data is None:
+                return
+            current_price = data['close'].iloc[-1]
         
         # Get average entry price (simplified - in real implementation you'd track this)
         # For now, we'll use a simple approach
-        account = self.api.get_account()
-        portfolio_value = float(account.portfolio_value)
         position_value = current_position * current_price
         estimated_entry_price = position_value / current_position  # Simplified
         
@@ -468,33 +560,219 @@ class TradingBot:
         print(f"Monitoring: {symbols}")
         print(f"Check interval: {check_interval} seconds\n")
         
+        try:
+            asyncio.run(self._strategy_loop(symbols, check_interval))
+        except KeyboardInterrupt:
+            print("\n🛑 Bot stopped by user")
+        finally:
+            self._close_sessions()
+
+    async def _strategy_loop(self, symbols, check_interval):
+        # REST calls are blocking, so each one runs in a worker thread and the
+        # symbols of a cycle are analysed concurrently instead of one by one
         while True:
             try:
-                if self.is_market_open():
+                if await asyncio.to_thread(self.is_market_open):
                     print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Market is open")
                     
-                    for symbol in symbols:
-                        # Use enhanced strategy with lenient conditions
-                        self.enhanced_strategy(symbol)
-                        # Apply risk management
-                        self.risk_management(symbol)
-                        time.sleep(2)  # Small delay between symbols
+                    # One bars, account and positions request shared by every symbol this cycle
+                    bars_by_symbol, account, positions = await asyncio.gather(
+                        asyncio.to_thread(self._update_bars, symbols, LIVE_BARS_LIMIT),
+                        asyncio.to_thread(self.api.get_account),
+                        asyncio.to_thread(self.api.list_positions))
+                    self._buying_power = float(account.buying_power)
+                    self._positions = {p.symbol: float(p.qty) for p in positions}
+                    
+                    # Each symbol's report is buffered and printed in one piece, in symbol order
+                    output = _ThreadOutput(sys.stdout)
+                    sys.stdout = output
+                    try:
+                        reports = await asyncio.gather(*[
+                            asyncio.to_thread(self._run_symbol, symbol, bars_by_symbol.get(symbol), output)
+                            for symbol in symbols])
+                    finally:
+                        sys.stdout = output.stream
+                        self._positions = None
+                        self._buying_power = None
+                    for report in reports:
+                        print(report, end='')
                     
                 else:
                     print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Market is closed")
                 
                 print(f"💤 Sleeping for {check_interval} seconds...\n")
-                time.sleep(check_interval)
+                await asyncio.sleep(check_interval)
                 
-            except KeyboardInterrupt:
-                print("\n🛑 Bot stopped by user")
-                break
             except Exception as e:
                 print(f"❌ Error: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                await asyncio.sleep(60)  # Wait 1 minute before retrying
+
+    def _update_bars(self, symbols, limit):
+        """
+        Daily bars for run_strategy. The full window is fetched once per symbol; after
+        that only bars from each symbol's latest bar on are fetched (the latest one
+        may still be updating) and merged in, keeping the window length fixed
+        """
+        new_symbols = [s for s in symbols if s not in self._live_bars]
+        known_symbols = [s for s in symbols if s in self._live_bars]
+        if new_symbols:
+            self._live_bars.update(self.get_market_data_batch(new_symbols, limit=limit))
+        
+        if known_symbols:
+            since = min(self._live_bars[s].index[-1][1] for s in known_symbols)
+            data = self._fetch_market_data(known_symbols, '1Day', limit, start=since)
+            if data is not None:
+                fetched = set(data.index.get_level_values('symbol'))
+                for symbol in known_symbols:
+                    if symbol not in fetched:
+                        continue
+                    bars = self._live_bars[symbol]
+                    merged = pd.concat([bars, data.xs(symbol, level='symbol', drop_level=False)])
+                    merged = merged[~merged.index.duplicated(keep='last')]
+                    self._live_bars[symbol] = merged.iloc[-len(bars):]
+        
+        return {s: self._live_bars[s] for s in symbols if s in self._live_bars}
+    
+    def _run_symbol(self, symbol, data, output):
+        # Returns everything the pass printed; a failing symbol reports its
+        # error there instead of cancelling the others' reports
+        with output.capture() as report:
+            try:
+                # Use enhanced strategy with lenient conditions
+                current_price = self.enhanced_strategy(symbol, data=data)
+                # Apply risk management, reusing the price the strategy just fetched
+                self.risk_management(symbol, current_price=current_price)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+        return report.getvalue()
+
+    def run_stream(self, symbols=['SPY'], check_interval=120):
+        """
+        Run the trading strategy on live bars from Alpaca's websocket
+        Each new minute bar is folded into its symbol's daily bars and triggers the
+        strategy for that symbol instead of polling every symbol on a fixed interval
+        check_interval: seconds between refreshes of positions and buying power
+        """
+        print("🤖 LENIENT Trading bot started (streaming)!")
+        print(f"Monitoring: {symbols}\n")
+        
+        # Daily bars, positions and buying power are fetched once here. After that
+        # bars only come from the stream, and the account is re-read every check_interval
+        self._update_bars(symbols, LIVE_BARS_LIMIT)
+        self._stream_start = pd.Timestamp.now(tz='UTC')
+        self._sync_account()
+        next_sync = datetime.now() + timedelta(seconds=check_interval)
+        
+        stream = StockDataStream(self.api_key, self.secret_key)
+        
+        async def on_bar(bar):
+            nonlocal next_sync
+            print(f"⏰ {bar.timestamp.strftime('%Y-%m-%d %H:%M:%S')} - New bar for {bar.symbol}")
+            sync_account = datetime.now() >= next_sync
+            if sync_account:
+                next_sync = datetime.now() + timedelta(seconds=check_interval)
+            # Strategy and order calls block, keep them off the stream's event loop
+            await asyncio.to_thread(self._handle_bar, bar, sync_account)
+        
+        stream.subscribe_bars(on_bar, *symbols)
+        try:
+            # run() handles Ctrl-C itself and just returns
+            stream.run()
+        finally:
+            print("\n🛑 Bot stopped")
+            self._positions = None
+            self._buying_power = None
+            self._close_sessions()
+
+    def _handle_bar(self, bar, sync_account=False):
+        try:
+            if sync_account:
+                self._sync_account()
+            data = self._fold_bar(bar)
+            self.enhanced_strategy(bar.symbol, data=data)
+            self.risk_management(bar.symbol, current_price=bar.close)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+
+    def _sync_account(self):
+        """Snapshot positions and buying power for get_position / _get_buying_power"""
+        positions = self.api.list_positions()
+        self._buying_power = float(self.api.get_account().buying_power)
+        self._positions = {p.symbol: float(p.qty) for p in positions}
+
+    def _fold_bar(self, bar):
+        """
+        Daily bars for run_stream. A minute bar updates its day's bar in the window
+        fetched at start (or starts the next day), keeping the window length fixed
+        """
+        symbol = bar.symbol
+        bars = self._live_bars.get(symbol)
+        if bars is None:
+            # The fetch at start failed for this symbol, try again
+            return self._update_bars([symbol], LIVE_BARS_LIMIT).get(symbol)
+        
+        timestamp = pd.Timestamp(bar.timestamp)
+        if timestamp + pd.Timedelta(minutes=1) <= self._stream_start:
+            return bars  # Already counted in the fetched daily bars
+        
+        # Daily bars are stamped at midnight New York time
+        day = timestamp.tz_convert('America/New_York').normalize()
+        stamp = bars.index[-1][1]
+        last_day = stamp.tz_convert('America/New_York').normalize()
+        if day < last_day:
+            return bars
+        
+        if day == last_day:
+            last = bars.iloc[-1]
+            volume = last['volume'] + bar.volume
+            values = {'open': last['open'], 'high': max(last['high'], bar.high),
+                      'low': min(last['low'], bar.low), 'close': bar.close, 'volume': volume}
+            if 'trade_count' in bars:
+                values['trade_count'] = last['trade_count'] + bar.trade_count
+            if 'vwap' in bars and volume > 0:
+                values['vwap'] = (last['vwap'] * last['volume'] + bar.vwap * bar.volume) / volume
+        else:
+            stamp = day.tz_convert('UTC')
+            values = {'open': bar.open, 'high': bar.high, 'low': bar.low, 'close': bar.close,
+                      'volume': bar.volume, 'trade_count': bar.trade_count, 'vwap': bar.vwap}
+        
+        index = pd.MultiIndex.from_tuples([(symbol, stamp)], names=bars.index.names)
+        row = pd.DataFrame({column: [value] for column, value in values.items() if column in bars},
+                           index=index)
+        merged = pd.concat([bars, row])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        self._live_bars[symbol] = merged.iloc[-len(bars):]
+        return self._live_bars[symbol]
+
+    def _configure_session(self, session):
+        """Keep connections to Alpaca alive between calls and retry gateway errors"""
+        # requests only retries idempotent methods, so orders are never resubmitted.
+        # 429/504 are left to the SDKs' own retry loop, and once retries run out the
+        # last response is returned so the SDK still raises its usual error
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503],
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        session.mount('https://', adapter)
+    
+    def _close_sessions(self):
+        self.api._session.close()
+        self.data_client._session.close()
+    
+    def _configure_connection(self):
+        # WAL + relaxed fsync so trade logging doesn't block on a full
+        # rollback-journal sync for every insert
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-64000")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA wal_autocheckpoint=1000")
 
     def _create_trades_table(self):
+        # The connection autocommits (isolation_level=None), so open the
+        # transaction explicitly; the with block commits it or rolls it back
         with self.conn:
+            self.conn.execute("BEGIN")
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS trades (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -506,6 +784,9 @@ class TradingBot:
                     order_id TEXT
                 )
             ''')
+            # Nothing reads trades back, so an index would only slow every insert
+            # (databases created while it existed still carry it)
+            self.conn.execute("DROP INDEX IF EXISTS idx_trades_symbol_ts")
 
     def _log_trade(self, symbol, action, qty, order):
         # Get the fill price if available, else use None
@@ -514,7 +795,8 @@ class TradingBot:
             price = float(order.filled_avg_price)
         except Exception:
             pass
-        with self.conn:
+        # A single INSERT commits atomically on the autocommit connection
+        with self._db_lock:
             self.conn.execute(
                 "INSERT INTO trades (timestamp, symbol, action, qty, price, order_id) VALUES (?, ?, ?, ?, ?, ?)",
                 (datetime.now().isoformat(), symbol, action, qty, price, getattr(order, 'id', None))